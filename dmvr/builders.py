@@ -15,11 +15,14 @@
 """Builders for video datasets."""
 
 import abc
-import collections
-import copy
+import dataclasses
 import enum
-from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+import itertools
+import linecache
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple, Union
+import weakref
 
+from absl import logging
 import tensorflow as tf
 
 
@@ -107,8 +110,25 @@ class BaseParserBuilder(abc.ABC):
   the same `feature_name` in processors (e.g. `builders.IMAGE` can be used as
   `output_name` for frames features independently of how they are stored in the
   input serialized example).
+
+  The parse function can also be built to process a batch of raw examples at
+  once by calling `build_batched()`. This uses the vectorized parsing ops,
+  which are considerably faster than parsing examples one at a time, as op
+  dispatch is amortized over the batch. In this case the dataset should be
+  batched before parsing (shuffle -> shard -> batch -> map):
+
+  ```python
+  batched_parse_fn = parser_builder.build_batched()
+  ds = ds.batch(batch_size).map(batched_parse_fn)
+  ```
   """
 
+  # Whether the builder supports batched parsing. Child classes setting it to
+  # `True` must implement `_parse_batched_fn(raw_data)`, converting a
+  # `tf.Tensor` of rank 1 of bytes to a features dictionary where all features
+  # have an extra leading batch dimension.
+  _supports_batched: bool = False
+
   @abc.abstractmethod
   def parse_feature(self,
                     feature_name: str,
@@ -148,20 +168,60 @@ class BaseParserBuilder(abc.ABC):
       The features dictionary obtained from parsing the raw data.
     """
 
-  def build(self) -> Parser:
-    """Builds parse function."""
-    return self._parse_fn
+  def build(self, batched: bool = False) -> Parser:
+    """Builds parse function.
+
+    Args:
+      batched: Whether the parse function should process a batch (`tf.Tensor`
+        of rank 1) of raw examples instead of a single one.
+
+    Returns:
+      The parse function.
+
+    Raises:
+      ValueError: `batched` is `True` but the builder does not support batched
+        parsing.
+    """
+    if not batched:
+      return self._parse_fn
+
+    if not self._supports_batched:
+      raise ValueError(
+          f'{type(self).__name__} does not support batched parsing.')
+    return self._parse_batched_fn
+
+  def build_batched(self) -> Parser:
+    """Builds parse function for a batch (`tf.Tensor` of rank 1) of raw data.
+
+    Returns:
+      The parse function. All features in its output have an extra leading
+      batch dimension.
+    """
+    return self.build(batched=True)
 
 
 class SequenceExampleParserBuilder(BaseParserBuilder):
   """Builder for the parser function from raw `tf.train.SequenceExample`."""
 
+  _supports_batched = True
+
   def __init__(self):
     super().__init__()
     self._features: Dict[Tuple[str, bool],
                          Union[tf.io.VarLenFeature, tf.io.FixedLenFeature,
                                tf.io.FixedLenSequenceFeature]] = {}
-    self._name_dict: Dict[Tuple[str, bool], List[str]] = {}
+    self._all_output_names: Set[str] = set()
+    # Flat renaming as `(output_name, feature_name)` pairs, kept separately for
+    # context and sequence features.
+    self._context_renames: List[Tuple[str, str]] = []
+    self._sequence_renames: List[Tuple[str, str]] = []
+    # Split of `_features`, computed once and reset whenever a feature is added.
+    self._context_features: Optional[Dict[
+        str, Union[tf.io.VarLenFeature, tf.io.FixedLenFeature,
+                   tf.io.FixedLenSequenceFeature]]] = None
+    self._sequence_features: Optional[Dict[
+        str, Union[tf.io.VarLenFeature, tf.io.FixedLenFeature,
+                   tf.io.FixedLenSequenceFeature]]] = None
 
   def parse_feature(self,
                     feature_name: str,
@@ -196,9 +256,8 @@ class SequenceExampleParserBuilder(BaseParserBuilder):
 
     # Validate name.
     output_name = output_name or feature_name
-    for name_list in self._name_dict.values():
-      if output_name in name_list:
-        raise ValueError(f'Given `output_name` {output_name} is not unique.')
+    if output_name in self._all_output_names:
+      raise ValueError(f'Given `output_name` {output_name} is not unique.')
 
     feature_key = (feature_name, is_context)
     if feature_key not in self._features:
@@ -207,44 +266,77 @@ class SequenceExampleParserBuilder(BaseParserBuilder):
       raise ValueError('Different `feature_type` given for the same feature '
                        f'{feature_name} with `is_context` {is_context}.')
 
-    if (feature_name, is_context) not in self._name_dict:
-      self._name_dict[(feature_name, is_context)] = []
-    self._name_dict[(feature_name, is_context)].append(output_name)
+    self._all_output_names.add(output_name)
+    if is_context:
+      self._context_renames.append((output_name, feature_name))
+    else:
+      self._sequence_renames.append((output_name, feature_name))
+    self._context_features = None
+    self._sequence_features = None
 
     return self
 
-  def _parse_fn(self, raw_data: tf.Tensor) -> FeaturesDict:
-    """Converts bytes of `tf.train.SequenceExample` to a features dictionary."""
-    context_features = {n: t for (n, c), t in self._features.items() if c}
-    sequence_features = {n: t for (n, c), t in self._features.items() if not c}
+  def _maybe_split_features(self):
+    """Splits features into context and sequence ones if not done yet.
 
-    parsed_context, parsed_sequence = tf.io.parse_single_sequence_example(
-        raw_data, context_features, sequence_features)
+    This is done lazily on the first call of the parse function, once instead
+    of on every call, and again only if features are added afterwards.
+    """
+    if self._context_features is not None:
+      return
 
-    # Rename features dict.
-    output = {}
-    for context, parsed in [(True, parsed_context), (False, parsed_sequence)]:
-      for k, f in parsed.items():
-        output_names = self._name_dict[(k, context)]
-        for output_name in output_names:
-          output[output_name]: tf.Tensor = tf.identity(f)
+    self._context_features = {n: t for (n, c), t in self._features.items() if c}
+    self._sequence_features = {
+        n: t for (n, c), t in self._features.items() if not c
+    }
 
+  def _parse_fn(self, raw_data: tf.Tensor) -> FeaturesDict:
+    """Converts bytes of `tf.train.SequenceExample` to a features dictionary."""
+    self._maybe_split_features()
+    parsed_context, parsed_sequence = tf.io.parse_single_sequence_example(
+        raw_data, self._context_features, self._sequence_features)
+    return self._rename(parsed_context, parsed_sequence)
+
+  def _parse_batched_fn(self, raw_data: tf.Tensor) -> FeaturesDict:
+    """Converts a batch of `tf.train.SequenceExample` to a features dict."""
+    self._maybe_split_features()
+    parsed_context, parsed_sequence, _ = tf.io.parse_sequence_example(
+        raw_data, self._context_features, self._sequence_features)
+    return self._rename(parsed_context, parsed_sequence)
+
+  def _rename(self, parsed_context: FeaturesDict,
+              parsed_sequence: FeaturesDict) -> FeaturesDict:
+    """Renames parsed features to their output names."""
+    # Tensors are immutable, so all output names can share the parsed tensor.
+    output = {n: parsed_context[k] for n, k in self._context_renames}
+    output.update((n, parsed_sequence[k]) for n, k in self._sequence_renames)
     return output
 
 
 class ExampleParserBuilder(BaseParserBuilder):
   """Builder for the parser function from raw `tf.train.Example`."""
 
+  _supports_batched = True
+
   def __init__(self):
     super().__init__()
     self._features = {}
-    self._name_dict: Dict[str, List[str]] = {}
+    self._all_output_names: Set[str] = set()
+    # Flat renaming: output name and name of the parsed feature it comes from,
+    # in the same order.
+    self._output_names: List[str] = []
+    self._parsed_keys: List[str] = []
+    # Dtype and shape of the features decoded from raw bytes after parsing.
+    self._raw_decode: Dict[str, Tuple[tf.dtypes.DType,
+                                      Optional[Tuple[int, ...]]]] = {}
 
   def parse_feature(
       self,
       feature_name: str,
       feature_type: Union[tf.io.VarLenFeature, tf.io.FixedLenFeature],
-      output_name: Optional[str] = None) -> 'ExampleParserBuilder':
+      output_name: Optional[str] = None,
+      raw_decode_as: Optional[tf.dtypes.DType] = None,
+      raw_shape: Optional[Sequence[int]] = None) -> 'ExampleParserBuilder':
     """Parses the given feature when parsing the raw `tf.train.Example`.
 
     The same input feature can be added more than once with different
@@ -252,10 +344,19 @@ class ExampleParserBuilder(BaseParserBuilder):
     multiple views (with different processings down the line) of the same data
     is needed.
 
+    Features stored as fixed length byte strings (e.g. raw pixels) can be
+    decoded directly by the parser with `tf.io.decode_raw` by giving
+    `raw_decode_as`, which avoids an extra processing stage for it.
+
     Args:
       feature_name: See base class.
       feature_type: See base class.
       output_name: See base class.
+      raw_decode_as: If given, the parsed bytes are decoded to a `tf.Tensor` of
+        this dtype. The feature must be a `tf.io.FixedLenFeature` of
+        `tf.string`.
+      raw_shape: Shape of each decoded feature, excluding batch dimensions. If
+        not given, the decoded feature is kept flat. Requires `raw_decode_as`.
 
     Returns:
       This instance of `ExampleParserBuilder`.
@@ -263,39 +364,67 @@ class ExampleParserBuilder(BaseParserBuilder):
     Raises:
       ValueError: `output_name` is not unique.
       ValueError: Different `feature_type` for the same input feature.
+      ValueError: `raw_shape` is given without `raw_decode_as`.
+      ValueError: `raw_decode_as` is given for a non fixed length string
+        feature.
+      ValueError: Different raw decoding for the same input feature.
     """
 
     # Validate name.
     output_name = output_name or feature_name
-    for name_list in self._name_dict.values():
-      if output_name in name_list:
-        raise ValueError(f'Given output_name {output_name} is not unique.')
+    if output_name in self._all_output_names:
+      raise ValueError(f'Given output_name {output_name} is not unique.')
+
+    raw_decode = None
+    if raw_decode_as is not None:
+      if (not isinstance(feature_type, tf.io.FixedLenFeature) or
+          feature_type.dtype != tf.string):
+        raise ValueError('`raw_decode_as` requires a `tf.io.FixedLenFeature` '
+                         f'of `tf.string` for feature {feature_name}.')
+      raw_decode = (raw_decode_as,
+                    tuple(raw_shape) if raw_shape is not None else None)
+    elif raw_shape is not None:
+      raise ValueError('`raw_shape` given without `raw_decode_as` for feature '
+                       f'{feature_name}.')
 
     if feature_name not in self._features:
       self._features[feature_name] = feature_type
+      if raw_decode is not None:
+        self._raw_decode[feature_name] = raw_decode
     elif self._features[feature_name] != feature_type:
       raise ValueError('Different `feature_type` given for the same feature '
                        f'{feature_name}.')
+    elif self._raw_decode.get(feature_name) != raw_decode:
+      raise ValueError('Different raw decoding given for the same feature '
+                       f'{feature_name}.')
 
-    if feature_name not in self._name_dict:
-      self._name_dict[feature_name] = []
-    self._name_dict[feature_name].append(output_name)
+    self._all_output_names.add(output_name)
+    self._output_names.append(output_name)
+    self._parsed_keys.append(feature_name)
 
     return self
 
   def _parse_fn(self, raw_data: tf.Tensor) -> FeaturesDict:
     """Converts bytes of raw Example to a features dictionary."""
-    parsed = tf.io.parse_single_example(
-        serialized=raw_data, features=self._features)
+    # `tf.io.parse_example` handles both scalar and batched inputs.
+    parsed = tf.io.parse_example(serialized=raw_data, features=self._features)
 
-    # Rename features dict.
-    output = {}
-    for k, f in parsed.items():
-      output_names = self._name_dict[k]
-      for output_name in output_names:
-        output[output_name]: tf.Tensor = tf.identity(f)
+    for k, (dtype, shape) in self._raw_decode.items():
+      decoded = tf.io.decode_raw(parsed[k], dtype)
+      if shape is not None:
+        # Keep the leading dimensions of the parsed feature (batch, if any).
+        decoded = tf.reshape(
+            decoded, tf.concat([tf.shape(parsed[k]), shape], axis=0))
+      parsed[k] = decoded
 
-    return output
+    # Rename features dict. Tensors are immutable, so all output names can
+    # share the parsed tensor.
+    return dict(
+        zip(self._output_names, [parsed[k] for k in self._parsed_keys]))
+
+  def _parse_batched_fn(self, raw_data: tf.Tensor) -> FeaturesDict:
+    """Converts a batch of raw Example to a features dictionary."""
+    return self._parse_fn(raw_data)
 
 
 RAW_FORMAT_TO_PARSER = {
@@ -304,8 +433,122 @@ RAW_FORMAT_TO_PARSER = {
 }
 
 
-_FunctionDescription = collections.namedtuple(
-    '_FunctionDescription', ('fn_name', 'fn', 'feature_name', 'stateful'))
+@dataclasses.dataclass
+class _FunctionDescription:
+  """Description of a function added to a `_Builder`.
+
+  Not frozen, as frozen dataclasses with `__slots__` cannot be copied or
+  pickled before Python 3.10. Descriptions are replaced, never modified.
+  """
+  __slots__ = ('fn_name', 'fn', 'feature_name', 'stateful', 'jit')
+
+  fn_name: str
+  fn: Callable[..., Any]
+  feature_name: Optional[str]
+  stateful: bool
+  jit: bool
+
+
+def _jit_compile(fn: Callable[..., Any]) -> Callable[..., Any]:
+  """Compiles the given function on NumPy arrays with Numba, if available.
+
+  Numba is imported here and not at module level, so pipelines not using
+  compiled functions do not pay for its import. Compilation itself happens
+  lazily on the first call, for the types of its inputs.
+
+  Args:
+    fn: Function to be compiled.
+
+  Returns:
+    The compiled function, or `fn` itself if Numba is not available.
+  """
+  try:
+    import numba  # pylint: disable=g-import-not-at-top
+  except ImportError:
+    logging.warning('Numba is not available, function %s is not compiled.',
+                    getattr(fn, '__name__', fn))
+    return fn
+
+  try:
+    # Compiled code is cached on disk to avoid the compilation cost on startup.
+    return numba.njit(cache=True)(fn)
+  except RuntimeError:
+    # Numba raises when no cache directory is writable, e.g. the function's
+    # source directory is read-only and `NUMBA_CACHE_DIR` is not set. Fall back
+    # to compiling without cache, instead of failing later inside the pipeline.
+    logging.warning('No writable Numba cache directory for function %s, it is '
+                    'compiled without caching.', getattr(fn, '__name__', fn))
+    return numba.njit(fn)
+
+
+def _wrap_numpy_fn(fn: Callable[..., Any]) -> FeatureProcessor:
+  """Wraps a function on NumPy arrays to be applied to a `tf.Tensor`."""
+
+  def feature_fn(x: tf.Tensor) -> tf.Tensor:
+    return tf.numpy_function(fn, [x], x.dtype)
+
+  return feature_fn
+
+
+# Step of a process function: `(feature_name, stateful, fn)`.
+_Step = Tuple[Optional[str], bool, Callable[..., Any]]
+
+
+# Ids of the generated process functions, used for their source file names.
+_generated_process_fn_ids = itertools.count()
+
+
+def _generate_process_fn(steps: Sequence[_Step]) -> Processor:
+  """Generates a process function calling the given functions in order.
+
+  The list of functions is fixed once the process function is built, so the
+  loop over the functions is unrolled into straight-line code, with no dispatch
+  on `feature_name` or `stateful` at run time. Consecutive functions with the
+  same `feature_name` and `stateful` are fused into a single statement of
+  nested calls (e.g. `output['image'] = fn_2(fn_1(fn_0(output['image'])))`),
+  avoiding the intermediate reads and writes of the features dictionary.
+
+  Args:
+    steps: Tuples `(feature_name, stateful, fn)` of the functions to be called
+      in order.
+
+  Returns:
+    The process function.
+  """
+  namespace = {}
+  lines = [
+      'def process_fn(features_dict):',
+      '  output = features_dict.copy()',
+  ]
+  # The state is only needed if any function uses it.
+  if any(stateful for _, stateful, _ in steps):
+    lines.append('  state = {}')
+  groups = itertools.groupby(steps, key=lambda step: (step[0] or None, step[1]))
+  i = 0
+  for (feature_name, stateful), group in groups:
+    target = f'output[{feature_name!r}]' if feature_name else 'output'
+    state = ', state' if stateful else ''
+    expr = target
+    for _, _, fn in group:
+      namespace[f'fn_{i}'] = fn
+      expr = f'fn_{i}({expr}{state})'
+      i += 1
+    lines.append(f'  {target} = {expr}')
+  lines.append('  return output')
+
+  # Register the source under a unique file name so `inspect.getsource` works
+  # on the generated function. AutoGraph needs it to convert the function and,
+  # through it, the user functions it calls. The entry is removed once the
+  # function is garbage collected.
+  source = '\n'.join(lines) + '\n'
+  filename = f'<builder-{next(_generated_process_fn_ids)}>'
+  linecache.cache[filename] = (len(source), None, source.splitlines(True),
+                               filename)
+  code = compile(source, filename, 'exec')
+  exec(code, namespace)  # pylint: disable=exec-used
+  process_fn = namespace['process_fn']
+  weakref.finalize(process_fn, linecache.cache.pop, filename, None)
+  return process_fn
 
 
 class _Builder(abc.ABC):
@@ -399,16 +642,29 @@ class _Builder(abc.ABC):
   """
 
   def __init__(self):
-    self._fns_list = []
+    self._fns: Dict[str, _FunctionDescription] = {}
+    # Order of the functions as a circular doubly linked list over their names,
+    # mapping each name to `[prev_fn_name, next_fn_name]`. The `None` key is
+    # the sentinel before the first and after the last function.
+    self._links: Dict[Optional[str], List[Optional[str]]] = {None: [None, None]}
+    # Process function generated by `build`, reset whenever functions change.
+    self._process_fn: Optional[Processor] = None
     self._fn_idx = 0
 
+  def __getstate__(self) -> Dict[str, Any]:
+    # The generated process function cannot be pickled, it is rebuilt instead.
+    state = self.__dict__.copy()
+    state['_process_fn'] = None
+    return state
+
   def add_fn(self,
              fn: Union[Processor, FeatureProcessor, StatefulProcessor,
                        StatefulFeatureProcessor],
              feature_name: Optional[str] = None,
              fn_name: Optional[str] = None,
              stateful: bool = False,
-             add_before_fn_name: Optional[str] = None) -> '_Builder':
+             add_before_fn_name: Optional[str] = None,
+             jit: bool = False) -> '_Builder':
     """Adds the given function to the processor.
 
     Args:
@@ -423,6 +679,14 @@ class _Builder(abc.ABC):
         `True`, the function should receive the state as second parameter.
       add_before_fn_name: Name of the function before which the given function
         should be added. If None, given function will be appended to the list.
+      jit: Whether the function operates on NumPy arrays and should be compiled
+        with Numba (if available). The function must transform a single feature
+        into a feature of the same dtype and cannot be stateful. It is run with
+        `tf.numpy_function`, so the shape of its output is unknown. Compiled
+        code is cached in the `__pycache__` next to the function's source (or
+        in `NUMBA_CACHE_DIR`); if none is writable, the function is compiled
+        without cache. Note that compilation happens on the first call, i.e.
+        when the pipeline runs.
 
     Returns:
       This instance of the builder.
@@ -430,35 +694,52 @@ class _Builder(abc.ABC):
     Raises:
       ValueError: `fn_name` is not unique.
       ValueError: Value of `add_before_fn_name` does not exist.
+      ValueError: `jit` is set for a stateful function or without
+        `feature_name`.
     """
     if fn_name is None:
       fn_name = f'fn_{self._fn_idx}'
       self._fn_idx += 1
 
-    if fn_name in [fd.fn_name for fd in self._fns_list]:
+    if fn_name in self._fns:
       raise ValueError(f'Given `fn_name` {fn_name} is not unique.')
 
-    new_fd = _FunctionDescription(fn_name, fn, feature_name, stateful)
+    if jit:
+      if stateful or not feature_name:
+        raise ValueError('Only stateless functions with a `feature_name` can '
+                         f'be compiled, got `fn_name` {fn_name}.')
+      fn = _jit_compile(fn)
+
+    new_fd = _FunctionDescription(fn_name, fn, feature_name, stateful, jit)
 
+    next_fn_name = None  # Append by inserting before the sentinel.
     if add_before_fn_name:
-      add_before_idx = [
-          i for i, fd in enumerate(self._fns_list)
-          if fd.fn_name == add_before_fn_name
-      ]
-      if not add_before_idx:
+      if add_before_fn_name not in self._fns:
         raise ValueError(
-            f'Given `add_before_idx` {add_before_idx} does not exist.')
+            f'Given `add_before_fn_name` {add_before_fn_name} does not exist.')
+      next_fn_name = add_before_fn_name
 
-      add_before_idx = add_before_idx[0]
-      self._fns_list.insert(add_before_idx, new_fd)
-    else:
-      self._fns_list.append(new_fd)
+    prev_fn_name = self._links[next_fn_name][0]
+    self._links[fn_name] = [prev_fn_name, next_fn_name]
+    self._links[prev_fn_name][1] = fn_name
+    self._links[next_fn_name][0] = fn_name
+    self._fns[fn_name] = new_fd
+    self._process_fn = None
 
     return self
 
+  def _iter_fns(self) -> Iterator[_FunctionDescription]:
+    """Iterates over the functions in the builder in order."""
+    fn_name = self._links[None][1]
+    while fn_name is not None:
+      yield self._fns[fn_name]
+      fn_name = self._links[fn_name][1]
+
   def reset(self) -> '_Builder':
     """Resets the list of functions in the builder."""
-    self._fns_list = []
+    self._fns = {}
+    self._links = {None: [None, None]}
+    self._process_fn = None
     return self
 
   def remove_fn(self, fn_name: str) -> '_Builder':
@@ -470,7 +751,12 @@ class _Builder(abc.ABC):
     Returns:
       This instance of the builder.
     """
-    self._fns_list = [fd for fd in self._fns_list if fd.fn_name != fn_name]
+    if fn_name in self._fns:
+      del self._fns[fn_name]
+      prev_fn_name, next_fn_name = self._links.pop(fn_name)
+      self._links[prev_fn_name][1] = next_fn_name
+      self._links[next_fn_name][0] = prev_fn_name
+      self._process_fn = None
     return self
 
   def replace_fn(
@@ -489,41 +775,63 @@ class _Builder(abc.ABC):
     Raises:
       ValueError: `fn_name` name does not exist.
     """
-    idx = [i for i, fd in enumerate(self._fns_list) if fd.fn_name == fn_name]
-    if not idx:
+    fd = self._fns.get(fn_name)
+    if fd is None:
       raise ValueError(f'Given `fn_name` {fn_name} does not exist.')
 
-    idx = idx[0]
-    fd = self._fns_list[idx]
-    new_fd = _FunctionDescription(fd.fn_name, fn, fd.feature_name, fd.stateful)
-    self._fns_list[idx] = new_fd
+    if fd.jit:
+      fn = _jit_compile(fn)
+    new_fd = _FunctionDescription(fd.fn_name, fn, fd.feature_name, fd.stateful,
+                                  fd.jit)
+    self._fns[fn_name] = new_fd
+    self._process_fn = None
     return self
 
-  def get_summary(self):
-    """Returns a summary of the current functions in the builder."""
-    return copy.copy(self._fns_list)
-
-  def build(self) -> Processor:
-    """Builds process function."""
-    fns_list = tuple(self._fns_list)
-
-    def process_fn(features_dict: FeaturesDict) -> FeaturesDict:
-      """Adds function one at a time."""
-      output = copy.copy(features_dict)
-      state: Dict[str, Any] = {}
-      for fd in fns_list:
-        if fd.feature_name:
-          if fd.stateful:
-            output[fd.feature_name] = fd.fn(output[fd.feature_name], state)
-          else:
-            output[fd.feature_name] = fd.fn(output[fd.feature_name])
-        else:
-          if fd.stateful:
-            output = fd.fn(output, state)
-          else:
-            output = fd.fn(output)
-
-      return output
+  def get_summary(self) -> List[_FunctionDescription]:
+    """Returns a summary of the current functions in the builder.
+
+    Returns:
+      The list of `_FunctionDescription` of the added functions, in order.
+      Their fields (`fn_name`, `fn`, `feature_name`, `stateful` and `jit`)
+      should be accessed by name, as these are not tuples and cannot be
+      unpacked or indexed.
+    """
+    return list(self._iter_fns())
+
+  def build(
+      self,
+      tf_function: bool = False,
+      input_signature: Optional[Sequence[Any]] = None,
+      autograph: bool = False) -> Processor:
+    """Builds process function.
+
+    Args:
+      tf_function: Whether to wrap the process function in a `tf.function`, so
+        its graph is traced once and reused.
+      input_signature: Input signature of the `tf.function`, i.e. a sequence
+        with the spec of the input features dictionary (e.g.
+        `[ds.element_spec]`). If given, the function is traced only once. Only
+        used if `tf_function` is `True`.
+      autograph: Whether AutoGraph is applied to the `tf.function`. Note that
+        this also applies to all added functions called by the process
+        function, so if `False`, they must be graph-compatible without
+        AutoGraph (e.g. no Python `if` or `for` on tensors). Only used if
+        `tf_function` is `True`.
+
+    Returns:
+      The process function.
+    """
+    if self._process_fn is None:
+      steps = tuple((fd.feature_name, fd.stateful,
+                     _wrap_numpy_fn(fd.fn) if fd.jit else fd.fn)
+                    for fd in self._iter_fns())
+      self._process_fn = _generate_process_fn(steps)
+
+    process_fn = self._process_fn
+
+    if tf_function:
+      process_fn = tf.function(
+          process_fn, input_signature=input_signature, autograph=autograph)
 
     return process_fn
 
@@ -639,15 +947,29 @@ class FilterBuilder:
     self._filter_fns[after_phase].append(filter_fn)
     return self
 
+  def has_filter_fns(self, after_phase: Phase) -> bool:
+    """Returns whether any filter function was added for the given phase.
+
+    When there is none, the built filter function keeps all examples and the
+    filtering stage can be skipped entirely.
+
+    Args:
+      after_phase: Phase after which the filter would be applied.
+    """
+    return bool(self._filter_fns[after_phase])
+
   def build(self, after_phase: Phase) -> FilterFn:
     """Builds the filter function for the given phase."""
-    filter_fns = copy.copy(self._filter_fns[after_phase])
+    filter_fns = list(self._filter_fns[after_phase])
 
-    def filter_fn(features_dict: FeaturesDict) -> tf.Tensor:
-      keep = tf.constant(True)
-      for fn in filter_fns:
-        keep = tf.logical_and(keep, fn(features_dict))
+    if not filter_fns:
+      return lambda _: tf.constant(True)
 
-      return keep
+    if len(filter_fns) == 1:
+      return filter_fns[0]
+
+    def filter_fn(features_dict: FeaturesDict) -> tf.Tensor:
+      # A single reduction instead of a chain of `tf.logical_and`.
+      return tf.reduce_all(tf.stack([fn(features_dict) for fn in filter_fns]))
 
     return filter_fn
@@ -14,11 +14,57 @@
 
 """Tests for builders."""
 
+import copy
+import gc
+import importlib.util
+import linecache
+import pickle
+import unittest
+
 from dmvr import builders
+import numpy as np
 from parameterized import parameterized
 import tensorflow as tf
 
 
+class _UnbatchedParserBuilder(builders.BaseParserBuilder):
+  """Parser builder implementing only the abstract methods."""
+
+  def parse_feature(self, feature_name, feature_type, output_name=None):
+    return self
+
+  def _parse_fn(self, raw_data):
+    return {'raw': raw_data}
+
+
+class _BatchedParserBuilder(_UnbatchedParserBuilder):
+  """Parser builder also supporting batched parsing."""
+
+  _supports_batched = True
+
+  def _parse_batched_fn(self, raw_data):
+    return {'raw_batch': raw_data}
+
+
+class BaseParserBuilderTest(tf.test.TestCase):
+
+  def test_unbatched_child_class(self):
+    parser_builder = _UnbatchedParserBuilder()
+    features_dict = parser_builder.build()(tf.constant('raw_bytes'))
+
+    self.assertEqual(features_dict['raw'], b'raw_bytes')
+
+    with self.assertRaises(ValueError) as _:
+      parser_builder.build(batched=True)
+
+  def test_batched_child_class(self):
+    parse_fn = _BatchedParserBuilder().build_batched()
+    features_dict = parse_fn(tf.constant(['raw_bytes_1', 'raw_bytes_2']))
+
+    self.assertAllEqual(features_dict['raw_batch'],
+                        [b'raw_bytes_1', b'raw_bytes_2'])
+
+
 class SequenceExampleParserBuilderTest(tf.test.TestCase):
 
   def setUp(self):
@@ -64,6 +110,39 @@ class SequenceExampleParserBuilderTest(tf.test.TestCase):
                         [[0, 0], [1, 0], [1, 1]])
     self.assertAllEqual(features_dict['var_len_seq_name'].dense_shape, [2, 2])
 
+  def test_parse_batched(self):
+    parse_fn = (
+        builders.SequenceExampleParserBuilder()
+        .parse_feature('my_context_feature',
+                       tf.io.FixedLenFeature((2,), dtype=tf.int64),
+                       'context_name', True)
+        .parse_feature('my_seq_feature',
+                       tf.io.FixedLenSequenceFeature((2,), dtype=tf.int64),
+                       'seq_name')
+        .build_batched())
+    features_dict = parse_fn(
+        tf.stack([self._raw_seq_example, self._raw_seq_example]))
+
+    self.assertSetEqual(set(['context_name', 'seq_name']),
+                        set(features_dict.keys()))
+    self.assertAllEqual(features_dict['context_name'], [[0, 1], [0, 1]])
+    self.assertAllEqual(features_dict['seq_name'],
+                        [[[2, 3], [4, 5]], [[2, 3], [4, 5]]])
+
+  def test_parse_feature_after_build(self):
+    parser_builder = builders.SequenceExampleParserBuilder().parse_feature(
+        'my_context_feature', tf.io.FixedLenFeature((2,), dtype=tf.int64),
+        'context_name', True)
+    parse_fn = parser_builder.build()
+    parser_builder.parse_feature(
+        'my_seq_feature', tf.io.FixedLenSequenceFeature((2,), dtype=tf.int64),
+        'seq_name')
+    features_dict = parse_fn(self._raw_seq_example)
+
+    self.assertSetEqual(set(['context_name', 'seq_name']),
+                        set(features_dict.keys()))
+    self.assertAllEqual(features_dict['seq_name'], [[2, 3], [4, 5]])
+
   def test_no_output_name(self):
     parse_fn = (
         builders.SequenceExampleParserBuilder()
@@ -117,6 +196,8 @@ class ExampleParserBuilderTest(tf.test.TestCase):
         'my_fixed_len_feature').int64_list.value[:] = [0, 1]
     tf_example.features.feature.get_or_create(
         'my_var_len_feature').int64_list.value[:] = [2, 3, 4]
+    tf_example.features.feature.get_or_create(
+        'my_raw_feature').bytes_list.value[:] = [bytes([5, 6, 7, 8, 9, 10])]
 
     # Put Example in expected format.
     self._raw_tf_example = tf.constant(tf_example.SerializeToString())
@@ -139,6 +220,80 @@ class ExampleParserBuilderTest(tf.test.TestCase):
     self.assertAllEqual(features_dict['var_name'].indices, [[0], [1], [2]])
     self.assertAllEqual(features_dict['var_name'].dense_shape, [3])
 
+  def test_parse_batched(self):
+    parse_fn = (
+        builders.ExampleParserBuilder()
+        .parse_feature('my_fixed_len_feature',
+                       tf.io.FixedLenFeature((2,), dtype=tf.int64),
+                       'fixed_name')
+        .parse_feature('my_var_len_feature',
+                       tf.io.VarLenFeature(dtype=tf.int64), 'var_name')
+        .build(batched=True))
+    features_dict = parse_fn(
+        tf.stack([self._raw_tf_example, self._raw_tf_example]))
+
+    self.assertSetEqual(set(['fixed_name', 'var_name']),
+                        set(features_dict.keys()))
+    self.assertAllEqual(features_dict['fixed_name'], [[0, 1], [0, 1]])
+    self.assertAllEqual(features_dict['var_name'].values, [2, 3, 4, 2, 3, 4])
+    self.assertAllEqual(features_dict['var_name'].dense_shape, [2, 3])
+
+  def test_parse_batched_dataset(self):
+    parse_fn = (
+        builders.ExampleParserBuilder()
+        .parse_feature('my_fixed_len_feature',
+                       tf.io.FixedLenFeature((2,), dtype=tf.int64),
+                       'fixed_name')
+        .build_batched())
+    ds = tf.data.Dataset.from_tensors(self._raw_tf_example).repeat(3)
+    ds = ds.batch(2).map(parse_fn)
+
+    batches = [fd['fixed_name'] for fd in ds]
+
+    self.assertLen(batches, 2)
+    self.assertAllEqual(batches[0], [[0, 1], [0, 1]])
+    self.assertAllEqual(batches[1], [[0, 1]])
+
+  def test_parse_raw(self):
+    parser_builder = (
+        builders.ExampleParserBuilder()
+        .parse_feature('my_raw_feature',
+                       tf.io.FixedLenFeature((), dtype=tf.string),
+                       'raw_name', raw_decode_as=tf.uint8, raw_shape=(3, 2))
+        .parse_feature('my_raw_feature',
+                       tf.io.FixedLenFeature((), dtype=tf.string),
+                       'raw_name_2', raw_decode_as=tf.uint8, raw_shape=(3, 2)))
+    features_dict = parser_builder.build()(self._raw_tf_example)
+    batched_features_dict = parser_builder.build(batched=True)(
+        tf.stack([self._raw_tf_example, self._raw_tf_example]))
+
+    self.assertEqual(features_dict['raw_name'].dtype, tf.uint8)
+    self.assertAllEqual(features_dict['raw_name'], [[5, 6], [7, 8], [9, 10]])
+    self.assertAllEqual(features_dict['raw_name_2'], [[5, 6], [7, 8], [9, 10]])
+    self.assertAllEqual(batched_features_dict['raw_name'],
+                        [[[5, 6], [7, 8], [9, 10]]] * 2)
+
+  def test_parse_raw_wrong_args(self):
+    parser_builder = builders.ExampleParserBuilder()
+
+    with self.assertRaises(ValueError) as _:
+      parser_builder.parse_feature(
+          'my_fixed_len_feature', tf.io.FixedLenFeature((2,), dtype=tf.int64),
+          raw_decode_as=tf.uint8)
+
+    with self.assertRaises(ValueError) as _:
+      parser_builder.parse_feature(
+          'my_raw_feature', tf.io.FixedLenFeature((), dtype=tf.string),
+          raw_shape=(3, 2))
+
+    parser_builder.parse_feature(
+        'my_raw_feature', tf.io.FixedLenFeature((), dtype=tf.string),
+        'raw_name', raw_decode_as=tf.uint8)
+    with self.assertRaises(ValueError) as _:
+      parser_builder.parse_feature(
+          'my_raw_feature', tf.io.FixedLenFeature((), dtype=tf.string),
+          'raw_name_2')
+
   def test_no_output_name(self):
     parse_fn = (
         builders.ExampleParserBuilder()
@@ -150,6 +305,23 @@ class ExampleParserBuilderTest(tf.test.TestCase):
     self.assertSetEqual(set(['my_fixed_len_feature']),
                         set(features_dict.keys()))
 
+  def test_multiple_output_names(self):
+    parse_fn = (
+        builders.ExampleParserBuilder()
+        .parse_feature('my_fixed_len_feature',
+                       tf.io.FixedLenFeature((2,), dtype=tf.int64),
+                       'fixed_name')
+        .parse_feature('my_fixed_len_feature',
+                       tf.io.FixedLenFeature((2,), dtype=tf.int64),
+                       'fixed_name_2')
+        .build())
+    features_dict = parse_fn(self._raw_tf_example)
+
+    self.assertSetEqual(set(['fixed_name', 'fixed_name_2']),
+                        set(features_dict.keys()))
+    self.assertAllEqual(features_dict['fixed_name'], [0, 1])
+    self.assertAllEqual(features_dict['fixed_name_2'], [0, 1])
+
   def test_same_output_name(self):
     parser_builder = builders.ExampleParserBuilder()
     parser_builder.parse_feature('my_fixed_len_feature',
@@ -199,6 +371,19 @@ def _add_text_len(features_dict):
   return features_dict
 
 
+def _numpy_double(x):
+  out = np.empty_like(x)
+  for i in range(x.shape[0]):
+    out[i] = 2 * x[i]
+  return out
+
+
+def _zero_if_large(x):
+  if tf.reduce_sum(x) > 3:
+    x = x * 0
+  return x
+
+
 def _set_state(x, state):
   state['value'] = x
   return x
@@ -237,6 +422,71 @@ class BuilderTest(tf.test.TestCase):
     self.assertEqual(output_features_dict['feature_2'], b'TEXT')
     self.assertEqual(output_features_dict['feature_3'], 4)
 
+  def test_tf_function(self):
+    input_signature = [{
+        'feature_1': tf.TensorSpec((), tf.int32),
+        'feature_2': tf.TensorSpec((), tf.string)
+    }]
+    process_fn = (
+        builders._Builder()
+        .add_fn(_add_one, 'feature_1')
+        .add_fn(_upper_text, 'feature_2')
+        .build(tf_function=True, input_signature=input_signature))
+    output_features_dict = process_fn(self._input_features_dict)
+
+    self.assertTrue(hasattr(process_fn, 'get_concrete_function'))
+    self.assertEqual(output_features_dict['feature_1'], 1)
+    self.assertEqual(output_features_dict['feature_2'], b'TEXT')
+
+  def test_source_released(self):
+    process_fn = builders._Builder().add_fn(_add_one, 'feature_1').build()
+    filename = process_fn.__code__.co_filename
+
+    self.assertIn(filename, linecache.cache)
+
+    del process_fn
+    gc.collect()
+
+    self.assertNotIn(filename, linecache.cache)
+
+  def test_dataset_map_autograph(self):
+    process_fn = (
+        builders._Builder()
+        .add_fn(_zero_if_large, 'feature_5')
+        .build())
+    ds = tf.data.Dataset.from_tensors({'feature_5': tf.constant([1, 2, 3])})
+    ds = ds.map(process_fn)
+
+    self.assertAllEqual(next(iter(ds))['feature_5'], [0, 0, 0])
+
+  def test_tf_function_autograph(self):
+    process_fn = (
+        builders._Builder()
+        .add_fn(_zero_if_large, 'feature_5')
+        .build(tf_function=True, autograph=True))
+    output_features_dict = process_fn({'feature_5': tf.constant([1, 2, 3])})
+
+    self.assertAllEqual(output_features_dict['feature_5'], [0, 0, 0])
+
+  def test_consecutive_fns(self):
+    process_fn = (
+        builders._Builder()
+        .add_fn(_add_one, 'feature_1')
+        .add_fn(_add_one, 'feature_1')
+        .add_fn(_subtract_one, 'feature_1')
+        .add_fn(_set_state, 'feature_1', stateful=True)
+        .add_fn(_add_one, 'feature_1')
+        .add_fn(_upper_text, 'feature_2')
+        .add_fn(_add_text_len)
+        .add_fn(_use_state, stateful=True)
+        .build())
+    output_features_dict = process_fn(self._input_features_dict)
+
+    self.assertEqual(output_features_dict['feature_1'], 2)
+    self.assertEqual(output_features_dict['feature_2'], b'TEXT')
+    self.assertEqual(output_features_dict['feature_3'], 4)
+    self.assertEqual(output_features_dict['feature_4'], 1)
+
   def test_replace(self):
     process_fn = (
         builders._Builder()
@@ -292,6 +542,39 @@ class BuilderTest(tf.test.TestCase):
     self.assertEqual(output_features_dict['feature_1'], 0)
     self.assertEqual(output_features_dict['feature_4'], 0)
 
+  def test_jit(self):
+    process_fn = (
+        builders._Builder()
+        .add_fn(_numpy_double, 'feature_5', fn_name='double', jit=True)
+        .add_fn(_add_one, 'feature_5')
+        .build())
+    output_features_dict = process_fn({'feature_5': tf.constant([1, 2, 3])})
+
+    self.assertAllEqual(output_features_dict['feature_5'], [3, 5, 7])
+
+  @unittest.skipIf(importlib.util.find_spec('numba') is None,
+                   'Numba is not installed.')
+  def test_jit_compiled(self):
+    import numba  # pylint: disable=g-import-not-at-top
+    builder = builders._Builder().add_fn(_numpy_double, 'feature_5', jit=True)
+
+    self.assertIsInstance(builder.get_summary()[0].fn,
+                          numba.core.dispatcher.Dispatcher)
+
+    builder.replace_fn('fn_0', _numpy_double)
+
+    self.assertIsInstance(builder.get_summary()[0].fn,
+                          numba.core.dispatcher.Dispatcher)
+
+  def test_jit_wrong_args(self):
+    builder = builders._Builder()
+
+    with self.assertRaises(ValueError) as _:
+      builder.add_fn(_numpy_double, jit=True)
+
+    with self.assertRaises(ValueError) as _:
+      builder.add_fn(_set_state, 'feature_1', stateful=True, jit=True)
+
   def test_same_fn_name(self):
     builder = builders._Builder().add_fn(_add_one, 'feature_1', 'add_one')
 
@@ -324,6 +607,77 @@ class BuilderTest(tf.test.TestCase):
     self.assertEqual(output_features_dict_2['feature_2'], b'replaced_text')
     self.assertEqual(output_features_dict_2['feature_3'], 13)
 
+  def test_insert_after_remove(self):
+    process_fn = (
+        builders._Builder()
+        .add_fn(_add_one, 'feature_1', 'add_one')
+        .add_fn(_upper_text, 'feature_2', 'upper_text')
+        .add_fn(_add_text_len, fn_name='text_len')
+        .remove_fn('add_one')
+        .add_fn(_subtract_one, 'feature_1', add_before_fn_name='text_len')
+        .replace_fn('upper_text', lambda x: x)
+        .build())
+    output_features_dict = process_fn(self._input_features_dict)
+
+    self.assertEqual(output_features_dict['feature_1'], -1)
+    self.assertEqual(output_features_dict['feature_2'], b'text')
+    self.assertEqual(output_features_dict['feature_3'], 4)
+
+  def test_get_summary(self):
+    builder = (
+        builders._Builder()
+        .add_fn(_add_one, 'feature_1', 'add_one')
+        .add_fn(_upper_text, 'feature_2', 'upper_text')
+        .add_fn(_subtract_one, 'feature_1', 'subtract_one',
+                add_before_fn_name='add_one')
+        .add_fn(_add_text_len, fn_name='text_len',
+                add_before_fn_name='upper_text')
+        .remove_fn('upper_text')
+        .add_fn(_upper_text, 'feature_2', 'upper_text_2'))
+
+    self.assertEqual(
+        [fd.fn_name for fd in builder.get_summary()],
+        ['subtract_one', 'add_one', 'text_len', 'upper_text_2'])
+
+  def test_copy_and_pickle(self):
+    builder = (
+        builders._Builder()
+        .add_fn(_add_one, 'feature_1', 'add_one')
+        .add_fn(_upper_text, 'feature_2', 'upper_text'))
+    summary = builder.get_summary()
+
+    self.assertEqual(copy.copy(summary[0]), summary[0])
+    self.assertEqual(pickle.loads(pickle.dumps(summary)), summary)
+
+    builder_copy = copy.deepcopy(builder)
+    builder_copy.remove_fn('upper_text')
+
+    self.assertEqual(builder_copy.get_summary(), summary[:1])
+    self.assertEqual(builder.get_summary(), summary)
+
+  def test_build_cached(self):
+    builder = builders._Builder().add_fn(_add_one, 'feature_1', 'add_one')
+    process_fn = builder.build()
+
+    self.assertIs(builder.build(), process_fn)
+
+    builder.replace_fn('add_one', _subtract_one)
+    process_fn_2 = builder.build()
+    output_features_dict = process_fn(self._input_features_dict)
+    output_features_dict_2 = process_fn_2(self._input_features_dict)
+
+    self.assertIsNot(process_fn_2, process_fn)
+    self.assertEqual(output_features_dict['feature_1'], 1)
+    self.assertEqual(output_features_dict_2['feature_1'], -1)
+
+  def test_pickle_built(self):
+    builder = builders._Builder().add_fn(_add_one, 'feature_1', 'add_one')
+    builder.build()
+    process_fn = pickle.loads(pickle.dumps(builder)).build()
+    output_features_dict = process_fn(self._input_features_dict)
+
+    self.assertEqual(output_features_dict['feature_1'], 1)
+
   def test_wrong_add_before_fn_name(self):
     builder = builders._Builder().add_fn(_add_one, 'feature_1', 'add_one')
 
@@ -375,6 +729,18 @@ class FilterBuilderTest(tf.test.TestCase):
 
     self.assertEqual(keep, True)
 
+  @parameterized.expand(((True,), (False,)))
+  def test_single(self, expected_keep):
+    filter_fn = (
+        builders.FilterBuilder()
+        .add_filter_fn(
+            lambda fd: tf.equal(fd['feature_1'], 0 if expected_keep else 1),
+            builders.Phase.DECODE)
+        .build(builders.Phase.DECODE))
+    keep = filter_fn(self._input_features_dict)
+
+    self.assertEqual(keep, expected_keep)
+
   @parameterized.expand(((builders.Phase.READ,), (builders.Phase.PARSE,),
                          (builders.Phase.SAMPLE,), (builders.Phase.DECODE,),
                          (builders.Phase.PREPROCESS,),
@@ -385,6 +751,13 @@ class FilterBuilderTest(tf.test.TestCase):
 
     self.assertEqual(keep, True)
 
+  def test_has_filter_fns(self):
+    filter_builder = builders.FilterBuilder().add_filter_fn(
+        lambda fd: tf.equal(fd['feature_1'], 0), builders.Phase.DECODE)
+
+    self.assertTrue(filter_builder.has_filter_fns(builders.Phase.DECODE))
+    self.assertFalse(filter_builder.has_filter_fns(builders.Phase.PARSE))
+
 
 if __name__ == '__main__':
   tf.test.main()
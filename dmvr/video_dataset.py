@@ -345,15 +345,20 @@ class BaseVideoDatasetFactory(abc.ABC):
     preprocess_fn = override_preprocess_fn or self.preprocessor_builder.build()
     postprocess_fn = self.postprocessor_builder.build()
 
-    # Filter functions.
-    filter_fn_post_read = self.filter_builder.build(builders.Phase.READ)
-    filter_fn_post_parse = self.filter_builder.build(builders.Phase.PARSE)
-    filter_fn_post_sample = self.filter_builder.build(builders.Phase.SAMPLE)
-    filter_fn_post_decode = self.filter_builder.build(builders.Phase.DECODE)
-    filter_fn_post_preprocess = self.filter_builder.build(
-        builders.Phase.PREPROCESS)
-    filter_fn_post_postprocess = self.filter_builder.build(
-        builders.Phase.POSTPROCESS)
+    # Filter functions. Phases without any filter function get `None` and no
+    # filtering stage is added to the dataset for them.
+    def build_filter_fn(
+        phase: builders.Phase) -> Optional[builders.FilterFn]:
+      if not self.filter_builder.has_filter_fns(phase):
+        return None
+      return self.filter_builder.build(phase)
+
+    filter_fn_post_read = build_filter_fn(builders.Phase.READ)
+    filter_fn_post_parse = build_filter_fn(builders.Phase.PARSE)
+    filter_fn_post_sample = build_filter_fn(builders.Phase.SAMPLE)
+    filter_fn_post_decode = build_filter_fn(builders.Phase.DECODE)
+    filter_fn_post_preprocess = build_filter_fn(builders.Phase.PREPROCESS)
+    filter_fn_post_postprocess = build_filter_fn(builders.Phase.POSTPROCESS)
 
     if shuffle and self._shuffle_buffer is None:
       raise ValueError(
@@ -382,8 +387,9 @@ class BaseVideoDatasetFactory(abc.ABC):
 
     # At this point, the features dictionary is not yet created. We artificially
     # create one with the key only to make the interface uniform.
-    ds = ds.filter(
-        lambda key, _: filter_fn_post_read({builders.KEY_FEATURE_NAME: key}))
+    if filter_fn_post_read is not None:
+      ds = ds.filter(
+          lambda key, _: filter_fn_post_read({builders.KEY_FEATURE_NAME: key}))
 
     if not cache:
       ds = ds.repeat(num_epochs)
@@ -395,7 +401,8 @@ class BaseVideoDatasetFactory(abc.ABC):
         parse_example,
         num_parallel_calls=self._num_parser_threads,
         deterministic=not shuffle)
-    ds = ds.filter(filter_fn_post_parse)
+    if filter_fn_post_parse is not None:
+      ds = ds.filter(filter_fn_post_parse)
 
     if cache:
       # We cache the dataset after the parsing operation. This means that we
@@ -418,21 +425,24 @@ class BaseVideoDatasetFactory(abc.ABC):
         sample_fn,
         num_parallel_calls=self._num_process_threads,
         deterministic=not shuffle)
-    ds = ds.filter(filter_fn_post_sample)
+    if filter_fn_post_sample is not None:
+      ds = ds.filter(filter_fn_post_sample)
 
     # Decode.
     ds = ds.map(
         decode_fn,
         num_parallel_calls=self._num_process_threads,
         deterministic=not shuffle)
-    ds = ds.filter(filter_fn_post_decode)
+    if filter_fn_post_decode is not None:
+      ds = ds.filter(filter_fn_post_decode)
 
     # Preprocess.
     ds = ds.map(
         preprocess_fn,
         num_parallel_calls=self._num_process_threads,
         deterministic=not shuffle)
-    ds = ds.filter(filter_fn_post_preprocess)
+    if filter_fn_post_preprocess is not None:
+      ds = ds.filter(filter_fn_post_preprocess)
 
     if experimental_kwargs.get('unbatch_after_preprocessing', False):
       ds = ds.unbatch()
@@ -453,7 +463,8 @@ class BaseVideoDatasetFactory(abc.ABC):
         postprocess_fn,
         num_parallel_calls=self._num_postprocess_threads,
         deterministic=not shuffle)
-    ds = ds.filter(filter_fn_post_postprocess)
+    if filter_fn_post_postprocess is not None:
+      ds = ds.filter(filter_fn_post_postprocess)
 
     ds = ds.prefetch(self._prefetch_buffer_size)
 
@@ -16,6 +16,7 @@
 
 import os
 from typing import List, Union
+from unittest import mock
 
 from dmvr import builders
 from dmvr import sources
@@ -170,6 +171,20 @@ class BaseVideoDatasetFactoryTest(tf.test.TestCase):
     self.assertSetEqual(set(data.keys()), set(['sequence', 'idx']))
     self.assertAllEqual(data['idx'], range(0, 20, 2))
 
+  def test_filter_only_phases_with_filter_fns(self):
+    self._factory.filter_builder.add_filter_fn(
+        lambda fd: tf.equal(fd['idx'] % 2, 0), builders.Phase.DECODE)
+    with mock.patch.object(
+        tf.data.Dataset, 'filter', autospec=True,
+        side_effect=tf.data.Dataset.filter) as filter_mock:
+      # Set block_length to guarantee reading examples in key order.
+      ds = self._factory.configure(keep_idx=True).tune(
+          block_length=10).make_dataset(shuffle=False, batch_size=10)
+
+    data = next(iter(ds))
+    self.assertEqual(filter_mock.call_count, 1)
+    self.assertAllEqual(data['idx'], range(0, 20, 2))
+
   def test_filter_postprocess(self):
     self._factory.filter_builder.add_filter_fn(
         lambda fd: tf.not_equal(fd['idx'][0], 0),  # Filter first batch.
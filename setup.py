@@ -40,7 +40,7 @@ setuptools.setup(
     packages=setuptools.find_namespace_packages(exclude=['*_test.py']),
     install_requires=_parse_requirements('requirements.txt'),
     tests_require=_parse_requirements('requirements-test.txt'),
-    requires_python='>=3.6',
+    requires_python='>=3.7',
     include_package_data=True,
     zip_safe=False,
     # PyPI package information.
@@ -50,7 +50,6 @@ setuptools.setup(
         'Intended Audience :: Science/Research',
         'License :: OSI Approved :: Apache Software License',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.6',
         'Programming Language :: Python :: 3.7',
         'Topic :: Scientific/Engineering :: Mathematics',
         'Topic :: Software Development :: Libraries :: Python Modules',